@@ -4,7 +4,9 @@ import sys
 if sys.version_info < (3, 11):
     raise RuntimeError("Python 3.11 or higher is required for the MCP plugin")
 
+import re
 import json
+import socket
 import struct
 import threading
 import http.server
@@ -21,8 +23,25 @@ from typing import (
     NotRequired,
     overload,
     Literal,
+    cast,
 )
 
+# NOTE: orjson is optional, IDA's Python environment usually doesn't have it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_dumps_bytes(value: Any) -> bytes:
+    """Serialize a JSON-RPC response, using orjson when it is available"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            # orjson is stricter than json (non-str keys, integers over 64 bits)
+            pass
+    return json.dumps(value).encode("utf-8")
+
 class JSONRPCError(Exception):
     def __init__(self, code: int, message: str, data: Any = None):
         self.code = code
@@ -33,6 +52,7 @@ class RPCRegistry:
     def __init__(self):
         self.methods: dict[str, Callable] = {}
         self.unsafe: set[str] = set()
+        self.param_hints: dict[str, dict[str, Any]] = {}
 
     def register(self, func: Callable) -> Callable:
         self.methods[func.__name__] = func
@@ -43,14 +63,17 @@ class RPCRegistry:
         return func
 
     def dispatch(self, method: str, params: Any) -> Any:
-        if method not in self.methods:
+        func = self.methods.get(method)
+        if func is None:
             raise JSONRPCError(-32601, f"Method '{method}' not found")
 
-        func = self.methods[method]
-        hints = get_type_hints(func)
-
-        # Remove return annotation if present
-        hints.pop("return", None)
+        # NOTE: get_type_hints is slow, so resolve the parameter types once per method
+        hints = self.param_hints.get(method)
+        if hints is None:
+            hints = get_type_hints(func)
+            # Remove return annotation if present
+            hints.pop("return", None)
+            self.param_hints[method] = hints
 
         if isinstance(params, list):
             if len(params) != len(hints):
@@ -98,7 +121,28 @@ def unsafe(func: Callable) -> Callable:
     return rpc_registry.mark_unsafe(func)
 
 class JSONRPCRequestHandler(http.server.BaseHTTPRequestHandler):
-    def send_jsonrpc_error(self, code: int, message: str, id: Any = None):
+    # NOTE: HTTP/1.1 keeps the connection from the MCP server alive between requests
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        cast(MCPHTTPServer, self.server).connections.add(self.connection)
+
+    def finish(self):
+        cast(MCPHTTPServer, self.server).connections.discard(self.connection)
+        super().finish()
+
+    def send_json_body(self, response_body: bytes, close: bool = False):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response_body)))
+        if close:
+            # NOTE: Also sets close_connection so the server drops the socket
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    def send_jsonrpc_error(self, code: int, message: str, id: Any = None, close: bool = False):
         response = {
             "jsonrpc": "2.0",
             "error": {
@@ -108,24 +152,21 @@ class JSONRPCRequestHandler(http.server.BaseHTTPRequestHandler):
         }
         if id is not None:
             response["id"] = id
-        response_body = json.dumps(response).encode("utf-8")
-        self.send_response(200)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(response_body)))
-        self.end_headers()
-        self.wfile.write(response_body)
+        self.send_json_body(json.dumps(response).encode("utf-8"), close)
 
     def do_POST(self):
         global rpc_registry
 
         parsed_path = urlparse(self.path)
         if parsed_path.path != "/mcp":
-            self.send_jsonrpc_error(-32098, "Invalid endpoint", None)
+            # The request body was not consumed, so the connection cannot be reused
+            self.send_jsonrpc_error(-32098, "Invalid endpoint", None, close=True)
             return
 
         content_length = int(self.headers.get("Content-Length", 0))
         if content_length == 0:
-            self.send_jsonrpc_error(-32700, "Parse error: missing request body", None)
+            # A body without Content-Length (chunked?) may still be unread
+            self.send_jsonrpc_error(-32700, "Parse error: missing request body", None, close=True)
             return
 
         request_body = self.rfile.read(content_length)
@@ -168,38 +209,50 @@ class JSONRPCRequestHandler(http.server.BaseHTTPRequestHandler):
                 "message": e.message,
             }
         except Exception as e:
-            traceback.print_exc()
+            # NOTE: Format the traceback once for both the console and the response
+            tb = traceback.format_exc()
+            sys.stderr.write(tb)
             response["error"] = {
                 "code": -32603,
                 "message": "Internal error (please report a bug)",
-                "data": traceback.format_exc(),
+                "data": tb,
             }
 
         try:
-            response_body = json.dumps(response).encode("utf-8")
+            response_body = json_dumps_bytes(response)
         except Exception as e:
-            traceback.print_exc()
+            tb = traceback.format_exc()
+            sys.stderr.write(tb)
             response_body = json.dumps({
                 "error": {
                     "code": -32603,
                     "message": "Internal error (please report a bug)",
-                    "data": traceback.format_exc(),
+                    "data": tb,
                 }
             }).encode("utf-8")
 
-        self.send_response(200)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(response_body)))
-        self.end_headers()
-        self.wfile.write(response_body)
+        self.send_json_body(response_body)
 
     def log_message(self, format, *args):
         # Suppress logging
         pass
 
-class MCPHTTPServer(http.server.HTTPServer):
+class MCPHTTPServer(http.server.ThreadingHTTPServer):
     allow_reuse_address = False
 
+    def __init__(self, *args, **kwargs):
+        self.connections: set[socket.socket] = set()
+        super().__init__(*args, **kwargs)
+
+    def server_close(self):
+        super().server_close()
+        # Kept-alive connections would otherwise outlive the server
+        for connection in list(self.connections):
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
 class Server:
     HOST = "localhost"
     PORT = 13337
@@ -271,7 +324,6 @@ import ida_bytes
 import ida_typeinf
 import ida_xref
 import ida_entry
-import idautils
 import ida_idd
 import ida_dbg
 import ida_name
@@ -420,7 +472,6 @@ def get_image_size() -> int:
         omin_ea = info.omin_ea
         omax_ea = info.omax_ea
     except AttributeError:
-        import ida_ida
         omin_ea = ida_ida.inf_get_omin_ea()
         omax_ea = ida_ida.inf_get_omax_ea()
     # Bad heuristic for image size (bad if the relocations are the last section)
@@ -510,9 +561,11 @@ def get_function(address, *, raise_error=True):
 
     return Function(address=hex(address), name=name, size=hex(fn.end_ea - fn.start_ea))
 
-DEMANGLED_TO_EA = {}
+DEMANGLED_TO_EA: dict[str, int] = {}
+DEMANGLED_TO_EA_CREATED = False
 
 def create_demangled_to_ea_map():
+    global DEMANGLED_TO_EA_CREATED
     for ea in idautils.Functions():
         # Get the function name and demangle it
         # MNG_NODEFINIT inhibits everything except the main name
@@ -522,53 +575,47 @@ def create_demangled_to_ea_map():
             idc.get_name(ea, 0), idaapi.MNG_NODEFINIT)
         if demangled:
             DEMANGLED_TO_EA[demangled] = ea
+    DEMANGLED_TO_EA_CREATED = True
 
-def get_type_by_name(type_name: str) -> ida_typeinf.tinfo_t:
+# Standard type names understood by get_type_by_name
+STANDARD_TYPE_GROUPS = {
     # 8-bit integers
-    if type_name in ('int8', '__int8', 'int8_t', 'char', 'signed char'):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_INT8)
-    elif type_name in ('uint8', '__uint8', 'uint8_t', 'unsigned char', 'byte', 'BYTE'):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_UINT8)
+    ('int8', '__int8', 'int8_t', 'char', 'signed char'): ida_typeinf.BTF_INT8,
+    ('uint8', '__uint8', 'uint8_t', 'unsigned char', 'byte', 'BYTE'): ida_typeinf.BTF_UINT8,
 
     # 16-bit integers
-    elif type_name in ('int16', '__int16', 'int16_t', 'short', 'short int', 'signed short', 'signed short int'):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_INT16)
-    elif type_name in ('uint16', '__uint16', 'uint16_t', 'unsigned short', 'unsigned short int', 'word', 'WORD'):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_UINT16)
+    ('int16', '__int16', 'int16_t', 'short', 'short int', 'signed short', 'signed short int'): ida_typeinf.BTF_INT16,
+    ('uint16', '__uint16', 'uint16_t', 'unsigned short', 'unsigned short int', 'word', 'WORD'): ida_typeinf.BTF_UINT16,
 
     # 32-bit integers
-    elif type_name in ('int32', '__int32', 'int32_t', 'int', 'signed int', 'long', 'long int', 'signed long', 'signed long int'):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_INT32)
-    elif type_name in ('uint32', '__uint32', 'uint32_t', 'unsigned int', 'unsigned long', 'unsigned long int', 'dword', 'DWORD'):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_UINT32)
+    ('int32', '__int32', 'int32_t', 'int', 'signed int', 'long', 'long int', 'signed long', 'signed long int'): ida_typeinf.BTF_INT32,
+    ('uint32', '__uint32', 'uint32_t', 'unsigned int', 'unsigned long', 'unsigned long int', 'dword', 'DWORD'): ida_typeinf.BTF_UINT32,
 
     # 64-bit integers
-    elif type_name in ('int64', '__int64', 'int64_t', 'long long', 'long long int', 'signed long long', 'signed long long int'):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_INT64)
-    elif type_name in ('uint64', '__uint64', 'uint64_t', 'unsigned int64', 'unsigned long long', 'unsigned long long int', 'qword', 'QWORD'):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_UINT64)
+    ('int64', '__int64', 'int64_t', 'long long', 'long long int', 'signed long long', 'signed long long int'): ida_typeinf.BTF_INT64,
+    ('uint64', '__uint64', 'uint64_t', 'unsigned int64', 'unsigned long long', 'unsigned long long int', 'qword', 'QWORD'): ida_typeinf.BTF_UINT64,
 
     # 128-bit integers
-    elif type_name in ('int128', '__int128', 'int128_t', '__int128_t'):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_INT128)
-    elif type_name in ('uint128', '__uint128', 'uint128_t', '__uint128_t', 'unsigned int128'):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_UINT128)
+    ('int128', '__int128', 'int128_t', '__int128_t'): ida_typeinf.BTF_INT128,
+    ('uint128', '__uint128', 'uint128_t', '__uint128_t', 'unsigned int128'): ida_typeinf.BTF_UINT128,
 
     # Floating point types
-    elif type_name in ('float', ):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_FLOAT)
-    elif type_name in ('double', ):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_DOUBLE)
-    elif type_name in ('long double', 'ldouble'):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_LDOUBLE)
+    ('float', ): ida_typeinf.BTF_FLOAT,
+    ('double', ): ida_typeinf.BTF_DOUBLE,
+    ('long double', 'ldouble'): ida_typeinf.BTF_LDOUBLE,
 
     # Boolean type
-    elif type_name in ('bool', '_Bool', 'boolean'):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_BOOL)
+    ('bool', '_Bool', 'boolean'): ida_typeinf.BTF_BOOL,
 
     # Void type
-    elif type_name in ('void', ):
-        return ida_typeinf.tinfo_t(ida_typeinf.BTF_VOID)
+    ('void', ): ida_typeinf.BTF_VOID,
+}
+STANDARD_TYPES = {name: bt for names, bt in STANDARD_TYPE_GROUPS.items() for name in names}
+
+def get_type_by_name(type_name: str) -> ida_typeinf.tinfo_t:
+    bt = STANDARD_TYPES.get(type_name)
+    if bt is not None:
+        return ida_typeinf.tinfo_t(bt)
 
     # If not a standard type, try to get a named type
     tif = ida_typeinf.tinfo_t()
@@ -598,12 +645,12 @@ def get_function_by_name(
     function_address = idaapi.get_name_ea(idaapi.BADADDR, name)
     if function_address == idaapi.BADADDR:
         # If map has not been created yet, create it
-        if len(DEMANGLED_TO_EA) == 0:
+        # NOTE: The map can be empty (no mangled names), so don't rebuild it on every miss
+        if not DEMANGLED_TO_EA_CREATED:
             create_demangled_to_ea_map()
         # Try to find the function in the map, else raise an error
-        if name in DEMANGLED_TO_EA:
-            function_address = DEMANGLED_TO_EA[name]
-        else:
+        function_address = DEMANGLED_TO_EA.get(name)
+        if function_address is None:
             raise IDAError(f"No function found with name {name}")
     return get_function(function_address)
 
@@ -634,6 +681,8 @@ class ConvertedNumber(TypedDict):
     ascii: Optional[str]
     binary: str
 
+PRINTABLE_ASCII = bytes(range(32, 127))
+
 @jsonrpc
 def convert_number(
     text: Annotated[str, "Textual representation of the number to convert"],
@@ -661,14 +710,12 @@ def convert_number(
     except OverflowError:
         raise IDAError(f"Number {text} is too big for {size} bytes")
 
-    # Convert the bytes to ASCII
-    ascii = ""
-    for byte in bytes.rstrip(b"\x00"):
-        if byte >= 32 and byte <= 126:
-            ascii += chr(byte)
-        else:
-            ascii = None
-            break
+    # Convert the bytes to ASCII (only if every byte is printable)
+    text_bytes = bytes.rstrip(b"\x00")
+    if text_bytes.translate(None, PRINTABLE_ASCII):
+        ascii = None
+    else:
+        ascii = text_bytes.decode("ascii")
 
     return ConvertedNumber(
         decimal=str(value),
@@ -699,10 +746,19 @@ def pattern_filter(data: list[T], pattern: str, key: str) -> list[T]:
     if not pattern:
         return data
 
-    # TODO: implement /regex/ matching
-
+    # /regex/ matching, the pattern is compiled once for all items
+    if len(pattern) > 2 and pattern.startswith("/") and pattern.endswith("/"):
+        try:
+            regex = re.compile(pattern[1:-1], re.IGNORECASE)
+        except re.error as e:
+            raise IDAError(f"Invalid regex {pattern}: {e}")
+        def matches_regex(item) -> bool:
+            return regex.search(item[key]) is not None
+        return list(filter(matches_regex, data))
+
+    pattern = pattern.lower()
     def matches(item) -> bool:
-        return pattern.lower() in item[key].lower()
+        return pattern in item[key].lower()
     return list(filter(matches, data))
 
 @jsonrpc
@@ -741,7 +797,7 @@ def list_globals_filter(
     for addr, name in idautils.Names():
         # Skip functions and none
         if not idaapi.get_func(addr) or name is None:
-            globals += [Global(address=hex(addr), name=name)]
+            globals.append(Global(address=hex(addr), name=name))
 
     globals = pattern_filter(globals, filter, "name")
     return paginate(globals, offset, count)
@@ -778,7 +834,7 @@ def list_imports(
             if not symbol_name:
                 symbol_name = f"#{ordinal}"
 
-            acc += [Import(address=hex(ea), imported_name=symbol_name, module=module_name)]
+            acc.append(Import(address=hex(ea), imported_name=symbol_name, module=module_name))
 
             return True
 
@@ -807,9 +863,7 @@ def list_strings_filter(
         try:
             string = str(item)
             if string:
-                strings += [
-                    String(address=hex(item.ea), length=item.length, string=string),
-                ]
+                strings.append(String(address=hex(item.ea), length=item.length, string=string))
         except:
             continue
     strings = pattern_filter(strings, filter, "string")
@@ -823,6 +877,10 @@ def list_strings(
     """List all strings in the database (paginated)"""
     return list_strings_filter(offset, count, "")
 
+# Flags used to print local types in list_local_types
+UDT_DECL_FLAGS = (ida_typeinf.PRTYPE_MULTI | ida_typeinf.PRTYPE_TYPE | ida_typeinf.PRTYPE_SEMI | ida_typeinf.PRTYPE_DEF | ida_typeinf.PRTYPE_METHODS | ida_typeinf.PRTYPE_OFFSETS)
+SIMPLE_DECL_FLAGS = ida_typeinf.PRTYPE_1LINE | ida_typeinf.PRTYPE_TYPE | ida_typeinf.PRTYPE_SEMI
+
 @jsonrpc
 @idaread
 def list_local_types():
@@ -840,12 +898,11 @@ def list_local_types():
                     type_name = f"<Anonymous Type #{ordinal}>"
                 locals.append(f"\nType #{ordinal}: {type_name}")
                 if tif.is_udt():
-                    c_decl_flags = (ida_typeinf.PRTYPE_MULTI | ida_typeinf.PRTYPE_TYPE | ida_typeinf.PRTYPE_SEMI | ida_typeinf.PRTYPE_DEF | ida_typeinf.PRTYPE_METHODS | ida_typeinf.PRTYPE_OFFSETS)
-                    c_decl_output = tif._print(None, c_decl_flags)
+                    c_decl_output = tif._print(None, UDT_DECL_FLAGS)
                     if c_decl_output:
                         locals.append(f"  C declaration:\n{c_decl_output}")
                 else:
-                    simple_decl = tif._print(None, ida_typeinf.PRTYPE_1LINE | ida_typeinf.PRTYPE_TYPE | ida_typeinf.PRTYPE_SEMI)
+                    simple_decl = tif._print(None, SIMPLE_DECL_FLAGS)
                     if simple_decl:
                         locals.append(f"  Simple declaration:\n{simple_decl}")
             else:
@@ -887,7 +944,7 @@ def decompile_function(
     if is_window_active():
         ida_hexrays.open_pseudocode(start, ida_hexrays.OPF_REUSE)
     sv = cfunc.get_pseudocode()
-    pseudocode = ""
+    lines: list[str] = []
     for i, sl in enumerate(sv):
         sl: ida_kernwin.simpleline_t
         item = ida_hexrays.ctree_item_t()
@@ -902,14 +959,12 @@ def decompile_function(
                     except ValueError:
                         pass
         line = ida_lines.tag_remove(sl.line)
-        if len(pseudocode) > 0:
-            pseudocode += "\n"
         if not addr:
-            pseudocode += f"/* line: {i} */ {line}"
+            lines.append(f"/* line: {i} */ {line}")
         else:
-            pseudocode += f"/* line: {i}, address: {hex(addr)} */ {line}"
+            lines.append(f"/* line: {i}, address: {hex(addr)} */ {line}")
 
-    return pseudocode
+    return "\n".join(lines)
 
 class DisassemblyLine(TypedDict):
     segment: NotRequired[str]
@@ -1028,11 +1083,9 @@ def get_xrefs_to(
     xrefs = []
     xref: ida_xref.xrefblk_t
     for xref in idautils.XrefsTo(parse_address(address)): # type: ignore (IDA SDK type hints are incorrect)
-        xrefs += [
-            Xref(address=hex(xref.frm),
-                 type="code" if xref.iscode else "data",
-                 function=get_function(xref.frm, raise_error=False))
-        ]
+        xrefs.append(Xref(address=hex(xref.frm),
+                          type="code" if xref.iscode else "data",
+                          function=get_function(xref.frm, raise_error=False)))
     return xrefs
 
 @jsonrpc
@@ -1069,13 +1122,16 @@ def get_xrefs_to_field(
     xrefs = []
     xref: ida_xref.xrefblk_t
     for xref in idautils.XrefsTo(tid): # type: ignore (IDA SDK type hints are incorrect)
-        xrefs += [
-            Xref(address=hex(xref.frm),
-                 type="code" if xref.iscode else "data",
-                 function=get_function(xref.frm, raise_error=False))
-        ]
+        xrefs.append(Xref(address=hex(xref.frm),
+                          type="code" if xref.iscode else "data",
+                          function=get_function(xref.frm, raise_error=False)))
     return xrefs
 
+# Instruction types of (x86) call instructions
+CALL_ITYPES = frozenset([idaapi.NN_call, idaapi.NN_callfi, idaapi.NN_callni])
+# Operand types of direct call targets
+DIRECT_CALL_OPTYPES = frozenset([idaapi.o_mem, idaapi.o_near, idaapi.o_far])
+
 @jsonrpc
 @idaread
 def get_callees(
@@ -1087,16 +1143,16 @@ def get_callees(
     if not func:
         raise IDAError(f"No function found containing address {function_address}")
     func_end = idc.find_func_end(func_start)
-    callees: list[dict[str, str]] = []
+    callees: dict[int, dict[str, str]] = {}
     current_ea = func_start
     while current_ea < func_end:
         insn = idaapi.insn_t()
         idaapi.decode_insn(insn, current_ea)
-        if insn.itype in [idaapi.NN_call, idaapi.NN_callfi, idaapi.NN_callni]:
+        if insn.itype in CALL_ITYPES:
             target = idc.get_operand_value(current_ea, 0)
             target_type = idc.get_operand_type(current_ea, 0)
             # check if it's a direct call - avoid getting the indirect call offset
-            if target_type in [idaapi.o_mem, idaapi.o_near, idaapi.o_far]:
+            if target_type in DIRECT_CALL_OPTYPES and target not in callees:
                 # in here, we do not use get_function because the target can be external function.
                 # but, we should mark the target as internal/external function.
                 func_type = (
@@ -1104,15 +1160,10 @@ def get_callees(
                 )
                 func_name = idc.get_name(target)
                 if func_name is not None:
-                    callees.append(
-                        {"address": hex(target), "name": func_name, "type": func_type}
-                    )
+                    callees[target] = {"address": hex(target), "name": func_name, "type": func_type}
         current_ea = idc.next_head(current_ea, func_end)
 
-    # deduplicate callees
-    unique_callee_tuples = {tuple(callee.items()) for callee in callees}
-    unique_callees = [dict(callee) for callee in unique_callee_tuples]
-    return unique_callees  # type: ignore
+    return list(callees.values())
 
 @jsonrpc
 @idaread
@@ -1130,7 +1181,7 @@ def get_callers(
         insn = idaapi.insn_t()
         idaapi.decode_insn(insn, caller_address)
         # check the instruction is a call
-        if insn.itype not in [idaapi.NN_call, idaapi.NN_callfi, idaapi.NN_callni]:
+        if insn.itype not in CALL_ITYPES:
             continue
         # deduplicate callers by address
         callers[func["address"]] = func
@@ -1550,9 +1601,9 @@ def get_defined_structures() -> list[StructureDefinition]:
                     for _, x in enumerate(udt)
                 ]
 
-            rv += [StructureDefinition(name=tif.get_type_name(), # type: ignore (IDA SDK type hints are incorrect)
-                                       size=hex(tif.get_size()),
-                                       members=members)]
+            rv.append(StructureDefinition(name=tif.get_type_name(), # type: ignore (IDA SDK type hints are incorrect)
+                                          size=hex(tif.get_size()),
+                                          members=members))
 
     return rv
 
@@ -1730,23 +1781,26 @@ def search_structures(filter: Annotated[str, "Filter pattern to search for struc
     """Search for structures by name pattern"""
     results = []
     limit = ida_typeinf.get_ordinal_limit()
+    filter = filter.lower()
 
     for ordinal in range(1, limit):
         tif = ida_typeinf.tinfo_t()
         if tif.get_numbered_type(None, ordinal):
             type_name: str = tif.get_type_name() # type: ignore (IDA SDK type hints are incorrect)
-            if type_name and filter.lower() in type_name.lower():
+            if type_name and filter in type_name.lower():
                 if tif.is_udt():
                     udt_data = ida_typeinf.udt_type_data_t()
                     member_count = 0
+                    is_union = False
                     if tif.get_udt_details(udt_data):
                         member_count = udt_data.size()
+                        is_union = udt_data.is_union
 
                     results.append({
                         "name": type_name,
                         "size": tif.get_size(),
                         "member_count": member_count,
-                        "is_union": udt_data.is_union if tif.get_udt_details(udt_data) else False,
+                        "is_union": is_union,
                         "ordinal": ordinal
                     })
 
@@ -1994,7 +2048,7 @@ def dbg_get_registers() -> list[ThreadRegisters]:
 
             if isinstance(reg_value, int):
                 reg_value = hex(reg_value)
-            if isinstance(reg_value, bytes):
+            elif isinstance(reg_value, bytes):
                 reg_value = reg_value.hex(" ")
             else:
                 reg_value = str(reg_value)
@@ -2083,7 +2137,7 @@ def dbg_list_breakpoints():
 def dbg_start_process():
     """Start the debugger, returns the current instruction pointer"""
 
-    if len(list_breakpoints()) == 0:
+    if ida_dbg.get_bpt_qty() == 0:
         for i in range(ida_entry.get_entry_qty()):
             ordinal = ida_entry.get_entry_ordinal(i)
             address = ida_entry.get_entry(ordinal)
@@ -2143,10 +2197,8 @@ def dbg_set_breakpoint(
     ea = parse_address(address)
     if idaapi.add_bpt(ea, 0, idaapi.BPT_SOFT):
         return f"Breakpoint set at {hex(ea)}"
-    breakpoints = list_breakpoints()
-    for bpt in breakpoints:
-        if bpt["ea"] == hex(ea):
-            return
+    if ida_dbg.exist_bpt(ea):
+        return
     raise IDAError(f"Failed to set breakpoint at address {hex(ea)}")
 
 @jsonrpc
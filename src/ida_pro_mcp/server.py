@@ -4,6 +4,7 @@ import ast
 import json
 import shutil
 import argparse
+import threading
 import http.client
 from urllib.parse import urlparse
 from glob import glob
@@ -16,11 +17,35 @@ mcp = FastMCP("ida-pro-mcp", log_level="ERROR")
 jsonrpc_request_id = 1
 ida_host = "127.0.0.1"
 ida_port = 13337
+ida_connection: http.client.HTTPConnection | None = None
+# NOTE: HTTPConnection is not thread safe and tools may be called from worker threads
+ida_connection_lock = threading.Lock()
+
+def send_jsonrpc_request(body: str) -> dict:
+    """Send a request to the IDA plugin over a shared keep-alive connection"""
+    global ida_connection
+    with ida_connection_lock:
+        while True:
+            if ida_connection is None:
+                ida_connection = http.client.HTTPConnection(ida_host, ida_port)
+            reused = ida_connection.sock is not None
+            try:
+                ida_connection.request("POST", "/mcp", body, {
+                    "Content-Type": "application/json"
+                })
+                response = ida_connection.getresponse()
+                return json.loads(response.read())
+            except Exception as e:
+                ida_connection.close()
+                ida_connection = None
+                # The plugin can drop an idle connection (restarted?), retry once on a fresh one
+                if reused and isinstance(e, (ConnectionResetError, BrokenPipeError)):
+                    continue
+                raise
 
 def make_jsonrpc_request(method: str, *params):
     """Make a JSON-RPC request to the IDA plugin"""
-    global jsonrpc_request_id, ida_host, ida_port
-    conn = http.client.HTTPConnection(ida_host, ida_port)
+    global jsonrpc_request_id
     request = {
         "jsonrpc": "2.0",
         "method": method,
@@ -29,31 +54,21 @@ def make_jsonrpc_request(method: str, *params):
     }
     jsonrpc_request_id += 1
 
-    try:
-        conn.request("POST", "/mcp", json.dumps(request), {
-            "Content-Type": "application/json"
-        })
-        response = conn.getresponse()
-        data = json.loads(response.read().decode())
-
-        if "error" in data:
-            error = data["error"]
-            code = error["code"]
-            message = error["message"]
-            pretty = f"JSON-RPC error {code}: {message}"
-            if "data" in error:
-                pretty += "\n" + error["data"]
-            raise Exception(pretty)
-
-        result = data["result"]
-        # NOTE: LLMs do not respond well to empty responses
-        if result is None:
-            result = "success"
-        return result
-    except Exception:
-        raise
-    finally:
-        conn.close()
+    data = send_jsonrpc_request(json.dumps(request))
+    if "error" in data:
+        error = data["error"]
+        code = error["code"]
+        message = error["message"]
+        pretty = f"JSON-RPC error {code}: {message}"
+        if "data" in error:
+            pretty += "\n" + error["data"]
+        raise Exception(pretty)
+
+    result = data["result"]
+    # NOTE: LLMs do not respond well to empty responses
+    if result is None:
+        result = "success"
+    return result
 
 @mcp.tool()
 def check_connection() -> str:
@@ -155,10 +170,11 @@ IDA_PLUGIN_PY = os.path.join(SCRIPT_DIR, "mcp-plugin.py")
 GENERATED_PY = os.path.join(SCRIPT_DIR, "server_generated.py")
 
 # NOTE: This is in the global scope on purpose
-if not os.path.exists(IDA_PLUGIN_PY):
-    raise RuntimeError(f"IDA plugin not found at {IDA_PLUGIN_PY} (did you move it?)")
-with open(IDA_PLUGIN_PY, "r", encoding="utf-8") as f:
-    code = f.read()
+try:
+    with open(IDA_PLUGIN_PY, "r", encoding="utf-8") as f:
+        code = f.read()
+except FileNotFoundError:
+    raise RuntimeError(f"IDA plugin not found at {IDA_PLUGIN_PY} (did you move it?)") from None
 module = ast.parse(code, IDA_PLUGIN_PY)
 visitor = MCPVisitor()
 visitor.visit(module)
@@ -174,18 +190,13 @@ from pydantic import Field
 T = TypeVar("T")
 
 """
-for type in visitor.types.values():
-    code += ast.unparse(type)
-    code += "\n\n"
-for function in visitor.functions.values():
-    code += ast.unparse(function)
-    code += "\n\n"
+code += "".join(f"{ast.unparse(node)}\n\n" for node in [*visitor.types.values(), *visitor.functions.values()])
 
 try:
-    if os.path.exists(GENERATED_PY):
+    try:
         with open(GENERATED_PY, "rb") as f:
             existing_code_bytes = f.read()
-    else:
+    except FileNotFoundError:
         existing_code_bytes = b""
     code_bytes = code.encode("utf-8").replace(b"\r", b"")
     if code_bytes != existing_code_bytes:
@@ -205,12 +216,7 @@ def generate_readme():
     print(f"- `check_connection()`: Check if the IDA plugin is running.")
     def get_description(name: str):
         function = visitor.functions[name]
-        signature = function.name + "("
-        for i, arg in enumerate(function.args.args):
-            if i > 0:
-                signature += ", "
-            signature += arg.arg
-        signature += ")"
+        signature = f"{function.name}({', '.join(arg.arg for arg in function.args.args)})"
         description = visitor.descriptions.get(function.name, "<no description>").strip().split("\n")[0]
         if description[-1] != ".":
             description += "."
@@ -255,8 +261,7 @@ def get_python_executable():
         if sys.platform == "win32":
             path = path.replace("/", "\\")
 
-        split = path.split(os.sep)
-        if split[-1].endswith(".zip"):
+        if path.endswith(".zip"):
             path = os.path.dirname(path)
             if sys.platform == "win32":
                 python_executable = os.path.join(path, "python.exe")
@@ -310,7 +315,10 @@ def print_mcp_config():
         }, indent=2)
     )
 
-def install_mcp_servers(*, uninstall=False, quiet=False, env={}):
+def install_mcp_servers(*, uninstall=False, quiet=False, env: dict[str, str] | None = None):
+    # NOTE: A {} default would be shared (and mutated) between calls
+    if env is None:
+        env = {}
     if sys.platform == "win32":
         configs = {
             "Cline": (os.path.join(os.getenv("APPDATA", ""), "Code", "User", "globalStorage", "saoudrizwan.claude-dev", "settings"), "cline_mcp_settings.json"),
@@ -356,20 +364,20 @@ def install_mcp_servers(*, uninstall=False, quiet=False, env={}):
             if not quiet:
                 print(f"Skipping {name} {action}\n  Config: {config_path} (not found)")
             continue
-        if not os.path.exists(config_path):
-            config = {}
-        else:
+        try:
             with open(config_path, "r", encoding="utf-8") as f:
                 data = f.read().strip()
-                if len(data) == 0:
-                    config = {}
-                else:
-                    try:
-                        config = json.loads(data)
-                    except json.decoder.JSONDecodeError:
-                        if not quiet:
-                            print(f"Skipping {name} uninstall\n  Config: {config_path} (invalid JSON)")
-                        continue
+        except FileNotFoundError:
+            data = ""
+        if len(data) == 0:
+            config = {}
+        else:
+            try:
+                config = json.loads(data)
+            except json.decoder.JSONDecodeError:
+                if not quiet:
+                    print(f"Skipping {name} uninstall\n  Config: {config_path} (invalid JSON)")
+                continue
         if "mcpServers" not in config:
             config["mcpServers"] = {}
         mcp_servers = config["mcpServers"]
@@ -403,8 +411,9 @@ def install_mcp_servers(*, uninstall=False, quiet=False, env={}):
             }
             if env:
                 mcp_servers[mcp.name]["env"] = env
+        # NOTE: json.dump issues a write per token, serialize first and write once
         with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=2)
+            f.write(json.dumps(config, indent=2))
         if not quiet:
             action = "Uninstalled" if uninstall else "Installed"
             print(f"{action} {name} MCP server (restart required)\n  Config: {config_path}")